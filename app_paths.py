@@ -7,11 +7,22 @@ User files (config.yaml, eventlogs/, outputs/, etc.) live next to the .exe,
 so we use Path(sys.executable).parent in that case.
 """
 
+import functools
 import sys
 from pathlib import Path
 
+import yaml
 
+
+@functools.lru_cache(maxsize=None)
 def project_root() -> Path:
+    """Resolved once per process: neither the executable nor this file moves at runtime."""
     if getattr(sys, "frozen", False):
         return Path(sys.executable).resolve().parent
     return Path(__file__).resolve().parent
+
+
+def load_config(config_path: str = "config.yaml") -> dict:
+    """Load configuration from YAML file."""
+    with open(config_path, "r") as f:
+        return yaml.safe_load(f)
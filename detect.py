@@ -4,27 +4,36 @@ Uses audio energy analysis + visual motion detection to find exciting moments.
 Supports Riot Live Client Data API events (kills) for accurate clip extraction.
 """
 
+import functools
 import json
+import re
 import subprocess
-import tempfile
 import os
 import shutil
+import tempfile
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from app_paths import project_root
+from app_paths import load_config, project_root  # noqa: F401 - load_config re-exported for callers
 
 import cv2
 import numpy as np
-import librosa
-import soundfile as sf
-import yaml
 
-from timer_utils import iter_with_timer
+try:
+    import orjson
+except ImportError:  # optional: faster event log parsing
+    orjson = None
 
 
 def _get_ffmpeg_bin(config: dict | None = None) -> tuple[str, str]:
     """Get paths to ffmpeg and ffprobe executables. Returns (ffmpeg_path, ffprobe_path)."""
-    cfg_path = (config or {}).get("ffmpeg_path", "").strip()
+    return _resolve_ffmpeg_bin((config or {}).get("ffmpeg_path", "").strip())
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_ffmpeg_bin(cfg_path: str) -> tuple[str, str]:
+    """Filesystem/PATH lookup behind _get_ffmpeg_bin, cached per configured ffmpeg_path."""
     if cfg_path:
         base = Path(cfg_path)
         fmpeg = str(base / "ffmpeg.exe") if os.name == "nt" else str(base / "ffmpeg")
@@ -57,72 +66,147 @@ def _get_ffmpeg_bin(config: dict | None = None) -> tuple[str, str]:
     )
 
 
-def load_config(config_path: str = "config.yaml") -> dict:
-    """Load configuration from YAML file."""
-    with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+def _load_json_file(path: str | Path) -> dict:
+    """Read and parse a JSON file, using orjson when installed."""
+    raw = Path(path).read_bytes()
+    return orjson.loads(raw) if orjson else json.loads(raw)
 
 
 def extract_audio(video_path: str, sample_rate: int = 22050, ffmpeg_path: str = "ffmpeg") -> tuple[np.ndarray, int]:
     """
-    Extract audio from video using FFmpeg and load with librosa.
-    Returns (audio_array, sample_rate).
+    Extract mono audio from video by piping raw 16-bit PCM out of FFmpeg (no temp WAV).
+    Returns (audio_array, sample_rate) with float32 samples in [-1, 1).
     """
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-        tmp_path = tmp.name
+    cmd = [
+        ffmpeg_path, "-v", "error", "-i", video_path,
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate), "-ac", "1",
+        "pipe:1",
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20)
+    raw, err = proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=None, stderr=err)
+    return _pcm_to_float(raw), sample_rate
+
+
+def _pcm_to_float(raw: bytes) -> np.ndarray:
+    """Convert s16le PCM bytes to float32 samples in [-1, 1)."""
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) * np.float32(1.0 / 32768.0)
+
+
+def _motion_filter(sample_interval_sec: float, resize_width: int, resize_height: int) -> str:
+    """FFmpeg filter that samples frames at the motion rate and shrinks them to small grayscale."""
+    return f"fps=1/{sample_interval_sec},scale={resize_width}:{resize_height},format=gray"
 
+
+def _read_fd(fd: int) -> bytes:
+    """Read a pipe file descriptor to EOF and close it."""
+    with os.fdopen(fd, "rb", buffering=1 << 20) as f:
+        return f.read()
+
+
+def _spool_fd_frames(fd: int, resize_width: int, resize_height: int) -> np.ndarray:
+    """_spool_frames for a raw pipe file descriptor (closed when done)."""
+    with os.fdopen(fd, "rb") as f:
+        return _spool_frames(f, resize_width, resize_height)
+
+
+def extract_audio_and_motion_frames(
+    video_path: str,
+    sample_rate: int = 22050,
+    sample_interval_sec: float = 1.0,
+    resize_width: int = 128,
+    resize_height: int = 72,
+    ffmpeg_path: str = "ffmpeg",
+) -> tuple[np.ndarray, np.ndarray, dict | None]:
+    """
+    Decode the video once and get both mono PCM audio and small grayscale motion frames.
+    FFmpeg writes each output to its own inherited pipe fd (POSIX only).
+    Returns (audio_array, frames, info) where frames has shape (N, resize_height, resize_width)
+    and info is {"duration", "fps"} parsed from FFmpeg's log, or None.
+    """
+    audio_r, audio_w = os.pipe()
+    video_r, video_w = os.pipe()
+    cmd = [
+        ffmpeg_path, "-hide_banner", "-nostats", "-i", video_path,
+        "-map", "0:a:0", "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate), "-ac", "1", f"pipe:{audio_w}",
+        "-map", "0:v:0", "-vf", _motion_filter(sample_interval_sec, resize_width, resize_height),
+        "-f", "rawvideo", "-pix_fmt", "gray", f"pipe:{video_w}",
+    ]
     try:
-        subprocess.run(
-            [
-                ffmpeg_path, "-y", "-i", video_path,
-                "-vn", "-acodec", "pcm_s16le",
-                "-ar", str(sample_rate), "-ac", "1",
-                tmp_path
-            ],
-            capture_output=True,
-            check=True,
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+            pass_fds=(audio_w, video_w),
         )
-        audio, sr = librosa.load(tmp_path, sr=sample_rate, mono=True)
-        return audio, sr
+    except OSError:
+        os.close(audio_r)
+        os.close(video_r)
+        raise
     finally:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
+        # Only the child keeps the write ends; otherwise the readers never see EOF
+        os.close(audio_w)
+        os.close(video_w)
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        audio_future = ex.submit(_read_fd, audio_r)
+        video_future = ex.submit(_spool_fd_frames, video_r, resize_width, resize_height)
+        _, err = proc.communicate()
+        audio_raw = audio_future.result()
+        frames = video_future.result()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=None, stderr=err)
+
+    info = _parse_ffmpeg_info(err.decode("utf-8", errors="replace"))
+    return _pcm_to_float(audio_raw), frames, info
+
+
+def _parse_ffmpeg_info(log_text: str) -> dict | None:
+    """Parse duration and FPS from FFmpeg's input banner. Returns None if duration is missing."""
+    m = re.search(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)", log_text)
+    if not m:
+        return None
+    duration = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+    m = re.search(r"(\d+(?:\.\d+)?)\s+fps", log_text)
+    fps = float(m.group(1)) if m else 30
+    return {"duration": duration, "fps": fps}
 
 
-def get_video_info(video_path: str, ffprobe_path: str = "ffprobe") -> dict:
-    """Get video duration and FPS using FFmpeg."""
-    # Get duration from format (most reliable)
+def probe_duration(video_path: str, ffprobe_path: str = "ffprobe") -> float:
+    """
+    Container duration in seconds from a single ffprobe call (0.0 if unknown).
+    Memoized per file version, so the eventlog lookup and the AI fallback share one probe.
+    """
+    path = os.path.abspath(video_path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0.0
+    return _probe_duration_cached(path, ffprobe_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=64)
+def _probe_duration_cached(path: str, ffprobe_path: str, _mtime_ns: int, _size: int) -> float:
+    # Duration from format (most reliable)
     result = subprocess.run(
         [
             ffprobe_path, "-v", "error", "-show_entries", "format=duration",
             "-of", "default=noprint_wrappers=1:nokey=1",
-            video_path
+            path
         ],
         capture_output=True,
         text=True,
     )
-    duration = float(result.stdout.strip()) if result.stdout.strip() else 0.0
+    return float(result.stdout.strip()) if result.stdout.strip() else 0.0
 
-    # Get FPS
-    result = subprocess.run(
-        [
-            ffprobe_path, "-v", "error", "-select_streams", "v:0",
-            "-show_entries", "stream=r_frame_rate",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            video_path
-        ],
-        capture_output=True,
-        text=True,
-    )
-    fps_str = result.stdout.strip()
-    if "/" in fps_str:
-        parts = fps_str.split("/")
-        num, den = int(parts[0]), int(parts[1]) if len(parts) > 1 else 1
-        fps = num / den if den else 30
-    else:
-        fps = float(fps_str) if fps_str else 30
 
-    return {"duration": duration, "fps": fps}
+def _segment_means(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Mean of each values[edges[i]:edges[i+1]] segment (last runs to the end), in one C pass."""
+    edges = edges.astype(np.intp)
+    sums = np.add.reduceat(values, edges)
+    counts = np.diff(np.append(edges, len(values)))
+    return sums / counts
 
 
 def compute_audio_energy(audio: np.ndarray, sr: int, window_seconds: float = 5.0) -> np.ndarray:
@@ -130,85 +214,166 @@ def compute_audio_energy(audio: np.ndarray, sr: int, window_seconds: float = 5.0
     Compute rolling RMS energy. High energy = likely action (team fights, kills, etc.).
     Returns array of energy values, one per window.
     """
-    hop_length = int(sr * 0.5)  # 0.5 sec hops
-    rms = librosa.feature.rms(y=audio, hop_length=hop_length)[0]
+    hop_length = max(1, int(sr * 0.5))  # 0.5 sec hops, non-overlapping frames
+    if len(audio) < hop_length:
+        audio = np.pad(audio, (0, hop_length - len(audio)))
+    n_frames = len(audio) // hop_length
+    frames = audio[:n_frames * hop_length].reshape(n_frames, hop_length)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / hop_length)
 
     # Resample to ~1 value per window_seconds
     n_windows = max(1, len(rms) // int(window_seconds * 2))  # 2 hops per sec
     if n_windows >= len(rms):
         return rms
-    rms_downsampled = np.array([
-        np.mean(rms[i * len(rms) // n_windows:(i + 1) * len(rms) // n_windows])
-        for i in range(n_windows)
-    ])
-    return rms_downsampled
+    edges = np.arange(n_windows) * len(rms) // n_windows
+    return _segment_means(rms, edges)
+
+
+def _spool_frames(src, resize_width: int, resize_height: int) -> np.ndarray:
+    """
+    Copy a rawvideo gray stream into an anonymous temp file and memory-map it as a
+    (N, height, width) uint8 stack, so long recordings never need one giant bytes object.
+    Any trailing partial frame is ignored.
+    """
+    frame_bytes = resize_width * resize_height
+    with tempfile.TemporaryFile() as tf:
+        shutil.copyfileobj(src, tf, length=1 << 20)
+        n_frames = tf.tell() // frame_bytes
+        if n_frames == 0:
+            return np.zeros((0, resize_height, resize_width), dtype=np.uint8)
+        # The mapping keeps its own handle, so closing the temp file here is safe
+        return np.memmap(tf, dtype=np.uint8, mode="r", shape=(n_frames, resize_height, resize_width))
+
+
+def _frame_diff_motions(frames: np.ndarray) -> np.ndarray:
+    """Mean absolute pixel difference between consecutive frames."""
+    # Vectorized over chunks of frames so the int16 temporaries stay small on long recordings
+    chunk = 512
+    return np.concatenate([
+        np.abs(np.diff(frames[i:i + chunk + 1].astype(np.int16), axis=0)).mean(axis=(1, 2))
+        for i in range(0, len(frames) - 1, chunk)
+    ]).astype(np.float32)
+
+
+def _optical_flow_motions(frames: np.ndarray, redetect_every: int) -> np.ndarray:
+    """
+    Mean displacement of up to 200 corners tracked with pyramidal Lucas-Kanade between
+    consecutive frames. Corners are re-detected every redetect_every frames (or when
+    too few survive), so the score follows on-screen action rather than every pixel change.
+    """
+    motions = np.zeros(len(frames) - 1, dtype=np.float32)
+    prev = np.ascontiguousarray(frames[0])
+    pts = None
+    for i in range(1, len(frames)):
+        gray = np.ascontiguousarray(frames[i])
+        if pts is None or len(pts) < 10 or (i - 1) % redetect_every == 0:
+            pts = cv2.goodFeaturesToTrack(prev, maxCorners=200, qualityLevel=0.3, minDistance=7)
+        if pts is not None:
+            new_pts, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, pts, None)
+            ok = status.reshape(-1) == 1
+            if ok.any():
+                motions[i - 1] = np.linalg.norm((new_pts[ok] - pts[ok]).reshape(-1, 2), axis=1).mean()
+                pts = new_pts[ok].reshape(-1, 1, 2)
+            else:
+                pts = None
+        prev = gray
+    return motions
+
+
+def compute_motion_from_frames(
+    frames: np.ndarray,
+    duration: float,
+    window_seconds: float = 5.0,
+    method: str = "optical_flow",
+    sample_interval_sec: float = 1.0,
+) -> np.ndarray:
+    """
+    Motion between consecutive frames of a (N, height, width) grayscale stack, averaged per window.
+    method: "optical_flow" (sparse Lucas-Kanade corner tracking) or "frame_diff" (mean pixel difference).
+    Returns array of motion scores per window.
+    """
+    if len(frames) < 3:
+        return np.array([0.0])
+
+    if method == "frame_diff":
+        motions = _frame_diff_motions(frames)
+    elif method == "optical_flow":
+        # Re-detect corners about every 2 s of video
+        motions = _optical_flow_motions(frames, max(1, round(2.0 / sample_interval_sec)))
+    else:
+        raise ValueError(f"motion_method must be 'optical_flow' or 'frame_diff', got {method!r}")
+
+    n_windows = max(1, int(duration / window_seconds))
+    window_size = max(1, len(motions) // n_windows)
+    end = min(n_windows * window_size, len(motions))
+    edges = np.arange(0, end, window_size)
+    return _segment_means(motions[:end], edges)
 
 
 def compute_motion_scores(
     video_path: str,
     duration: float,
-    fps: float,
     window_seconds: float = 5.0,
     sample_interval_sec: float = 1.0,
     resize_width: int = 128,
     resize_height: int = 72,
+    ffmpeg_path: str = "ffmpeg",
+    method: str = "optical_flow",
 ) -> np.ndarray:
     """
-    Sample frames and compute frame-to-frame difference (motion).
-    Uses seek-based sampling: only reads needed frames (much faster than sequential read).
+    Sample frames and compute frame-to-frame motion (see compute_motion_from_frames for method).
+    FFmpeg decodes at the sample rate and pipes small grayscale frames (no full-res decode in Python).
     High motion = action, team fights, etc.
     Returns array of motion scores per window.
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    cmd = [
+        ffmpeg_path, "-v", "error", "-i", video_path, "-an",
+        "-vf", _motion_filter(sample_interval_sec, resize_width, resize_height),
+        "-f", "rawvideo", "-pix_fmt", "gray", "pipe:1",
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=1 << 20)
+    except OSError:
         return np.zeros(int(duration / window_seconds) + 1)
-
-    total_frames = int(duration * fps)
-    sample_interval = max(1, int(fps * sample_interval_sec))  # e.g. 1 sample/sec = 30 frames apart at 30fps
-    num_samples = total_frames // sample_interval
-    if num_samples < 2:
-        cap.release()
-        return np.array([0.0])
-
-    prev_frame = None
-    motions = []
-    frame_indices = list(range(0, total_frames, sample_interval))
-
-    for i, frame_idx in enumerate(iter_with_timer(frame_indices, "Analyzing motion")):
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.resize(gray, (resize_width, resize_height))
-
-        if prev_frame is not None:
-            diff = cv2.absdiff(prev_frame, gray)
-            motion = np.mean(diff)
-            motions.append(motion)
-        prev_frame = gray
-
-    cap.release()
-
-    if len(motions) < 2:
-        return np.array([0.0])
-
-    motions = np.array(motions)
-    n_windows = max(1, int(duration / window_seconds))
-    window_size = max(1, len(motions) // n_windows)
-    motion_per_window = np.array([
-        np.mean(motions[i * window_size:min((i + 1) * window_size, len(motions))])
-        for i in range(n_windows)
-    ])
-    return motion_per_window
+    try:
+        frames = _spool_frames(proc.stdout, resize_width, resize_height)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    return compute_motion_from_frames(frames, duration, window_seconds, method, sample_interval_sec)
 
 
 def normalize_scores(scores: np.ndarray) -> np.ndarray:
     """Normalize to 0-1 range."""
-    if len(scores) == 0 or np.max(scores) == np.min(scores):
+    if scores.size == 0:
         return np.zeros_like(scores)
-    return (scores - np.min(scores)) / (np.max(scores) - np.min(scores))
+    lo = scores.min()
+    rng = scores.max() - lo
+    if rng == 0:
+        return np.zeros_like(scores)
+    return (scores - lo) * (1.0 / rng)
+
+
+def _select_spaced(candidates: list[dict], min_between: float, max_clips: int) -> list[dict]:
+    """
+    Greedily keep candidates in the given order, skipping any whose start is within
+    min_between seconds of an already-kept one. Only the nearest kept starts on either
+    side need checking, found by bisect on a sorted list.
+    """
+    selected = []
+    starts = []
+    for c in candidates:
+        if len(selected) >= max_clips:
+            break
+        start = c["start"]
+        i = bisect_left(starts, start)
+        if i > 0 and start - starts[i - 1] < min_between:
+            continue
+        if i < len(starts) and starts[i] - start < min_between:
+            continue
+        starts.insert(i, start)
+        selected.append(c)
+    return selected
 
 
 def get_matching_events_path(
@@ -237,16 +402,15 @@ def get_matching_events_path(
         video_ctime = os.path.getctime(video_path)
     except OSError:
         video_ctime = 0
-    ffmpeg_path, ffprobe_path = _get_ffmpeg_bin(config)
-    info = get_video_info(video_path, ffprobe_path)
-    video_end = video_ctime + info.get("duration", 0)
+    # Only the duration is needed here (one ffprobe call); detect_highlights' AI fallback reuses it
+    _, ffprobe_path = _get_ffmpeg_bin(config)
+    video_end = video_ctime + probe_duration(video_path, ffprobe_path)
 
     best_path = None
     best_count = 0
     for p in sorted(log_dir.glob("events_*.json"), reverse=True):
         try:
-            with open(p) as f:
-                data = json.load(f)
+            data = _load_json_file(p)
         except Exception:
             continue
         kills = [e for e in data.get("events", []) if e.get("type") == "ChampionKill"]
@@ -281,8 +445,7 @@ def load_highlights_from_events(
     if not path.exists():
         return None
     try:
-        with open(path, "r") as f:
-            data = json.load(f)
+        data = _load_json_file(path)
     except Exception:
         return None
 
@@ -333,15 +496,7 @@ def load_highlights_from_events(
 
     # Respect min spacing and max clips
     candidates.sort(key=lambda x: x["start"])
-    selected = []
-    for c in candidates:
-        if len(selected) >= max_clips:
-            break
-        if any(abs(c["start"] - s["start"]) < min_between for s in selected):
-            continue
-        selected.append(c)
-
-    return selected
+    return _select_spaced(candidates, min_between, max_clips)
 
 
 def detect_highlights(
@@ -393,6 +548,7 @@ def detect_highlights(
     min_between = det_cfg.get("min_seconds_between_clips", 120)
     max_clips = det_cfg.get("max_clips_per_video", 5)
     window_sec = det_cfg.get("window_seconds", 4)
+    motion_method = det_cfg.get("motion_method", "optical_flow")
     padding_before = clip_cfg.get("padding_before", 10)
     padding_after = clip_cfg.get("padding_after", 8)
 
@@ -401,36 +557,59 @@ def detect_highlights(
         raise FileNotFoundError(f"Video not found: {video_path}")
 
     ffmpeg_path, ffprobe_path = _get_ffmpeg_bin(config)
-    info = get_video_info(video_path, ffprobe_path)
-    duration = info["duration"]
-    fps = info["fps"]
 
-    # Audio analysis (lower sample rate for faster processing; 11025 sufficient for energy detection)
     perf_cfg = config.get("performance", {})
+    # Audio analysis (lower sample rate for faster processing; 11025 sufficient for energy detection)
     audio_sr = perf_cfg.get("audio_sample_rate", 11025)
-    print("  Extracting audio...")
-    audio, sr = extract_audio(video_path, sample_rate=audio_sr, ffmpeg_path=ffmpeg_path)
-    audio_energy = compute_audio_energy(audio, sr, window_sec)
-    audio_norm = normalize_scores(audio_energy)
+    # Motion analysis (FFmpeg subsamples + downscales; only tiny gray frames reach Python)
+    motion_sample_sec = perf_cfg.get("motion_sample_interval_sec", 1.0)
+    motion_resize = perf_cfg.get("motion_resize", [128, 72])
+    motion_resize = motion_resize if isinstance(motion_resize, (list, tuple)) else [128, 72]
+    resize_w = motion_resize[0] if len(motion_resize) > 0 else 128
+    resize_h = motion_resize[1] if len(motion_resize) > 1 else 72
+
+    def _audio_scores():
+        audio, sr = extract_audio(video_path, sample_rate=audio_sr, ffmpeg_path=ffmpeg_path)
+        return normalize_scores(compute_audio_energy(audio, sr, window_sec))
+
+    def _motion_scores():
+        return normalize_scores(compute_motion_scores(
+            video_path, duration, window_sec,
+            sample_interval_sec=motion_sample_sec,
+            resize_width=resize_w,
+            resize_height=resize_h,
+            ffmpeg_path=ffmpeg_path,
+            method=motion_method,
+        ))
+
+    print("  Extracting audio and analyzing motion...")
+    if os.name != "nt":
+        # One FFmpeg pass demuxes/decodes the file once and feeds both analyses. Its banner
+        # carries the duration; ffprobe (memoized, usually already run by the eventlog lookup)
+        # is only the fallback.
+        audio, frames, info = extract_audio_and_motion_frames(
+            video_path, sample_rate=audio_sr, sample_interval_sec=motion_sample_sec,
+            resize_width=resize_w, resize_height=resize_h, ffmpeg_path=ffmpeg_path,
+        )
+        duration = info["duration"] if info else probe_duration(video_path, ffprobe_path)
+        audio_norm = normalize_scores(compute_audio_energy(audio, audio_sr, window_sec))
+        motion_norm = normalize_scores(compute_motion_from_frames(
+            frames, duration, window_sec, motion_method, motion_sample_sec,
+        ))
+    else:
+        # No fd inheritance for extra pipes on Windows: run two FFmpeg pipes side by side instead
+        duration = probe_duration(video_path, ffprobe_path)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            audio_future = ex.submit(_audio_scores)
+            motion_future = ex.submit(_motion_scores)
+            audio_norm = audio_future.result()
+            motion_norm = motion_future.result()
 
     # Pad/trim to match duration
     n_windows = max(len(audio_norm), int(duration / window_sec))
     if len(audio_norm) < n_windows:
         audio_norm = np.pad(audio_norm, (0, n_windows - len(audio_norm)), mode="edge")
     audio_norm = audio_norm[:n_windows]
-
-    # Motion analysis (seek-based: only reads sampled frames for ~10–30x speedup)
-    print("  Analyzing motion...")
-    motion_sample_sec = perf_cfg.get("motion_sample_interval_sec", 1.0)
-    motion_resize = perf_cfg.get("motion_resize", [128, 72])
-    motion_resize = motion_resize if isinstance(motion_resize, (list, tuple)) else [128, 72]
-    motion_scores = compute_motion_scores(
-        video_path, duration, fps, window_sec,
-        sample_interval_sec=motion_sample_sec,
-        resize_width=motion_resize[0] if len(motion_resize) > 0 else 128,
-        resize_height=motion_resize[1] if len(motion_resize) > 1 else 72,
-    )
-    motion_norm = normalize_scores(motion_scores)
     if len(motion_norm) < n_windows:
         motion_norm = np.pad(motion_norm, (0, n_windows - len(motion_norm)), mode="edge")
     motion_norm = motion_norm[:n_windows]
@@ -440,39 +619,27 @@ def detect_highlights(
     threshold = np.percentile(combined, 100 - (sensitivity * 40))  # Higher sensitivity = lower threshold
 
     # Find peaks: local maxima above threshold, with minimum score and prominence
+    mid, left, right = combined[1:-1], combined[:-2], combined[2:]
+    is_peak = (mid >= left) & (mid >= right)  # Must be local maximum
+    is_peak &= mid >= max(threshold, min_score)  # Above threshold and minimum score
+    # Prominence: peak should stand out from neighbors (avoids noise)
+    is_peak &= (mid - np.minimum(left, right)) >= min_prominence
+    min_clip_length = clip_cfg.get("min_clip_length", 15)
+
     candidates = []
-    for i in range(1, len(combined) - 1):
-        score = combined[i]
-        # Must be local maximum
-        if score < combined[i - 1] or score < combined[i + 1]:
-            continue
-        # Above threshold and minimum score
-        if score < threshold or score < min_score:
-            continue
-        # Prominence: peak should stand out from neighbors (avoids noise)
-        valley = min(combined[i - 1], combined[i + 1])
-        if score - valley < min_prominence:
-            continue
-        peak_sec = i * window_sec
+    for i in np.nonzero(is_peak)[0] + 1:
+        peak_sec = int(i) * window_sec
         start_sec = max(0, peak_sec - padding_before)
         end_sec = min(duration, peak_sec + padding_after)
-        if end_sec - start_sec >= clip_cfg.get("min_clip_length", 15):
+        if end_sec - start_sec >= min_clip_length:
             candidates.append({
                 "start": start_sec,
                 "end": end_sec,
-                "score": float(score),
+                "score": float(combined[i]),
             })
 
     # Non-maximum suppression: keep best candidates, respect min_seconds_between_clips
     candidates.sort(key=lambda x: x["score"], reverse=True)
-    selected = []
-    for c in candidates:
-        if len(selected) >= max_clips:
-            break
-        # Check if too close to existing
-        if any(abs(c["start"] - s["start"]) < min_between for s in selected):
-            continue
-        selected.append(c)
-
+    selected = _select_spaced(candidates, min_between, max_clips)
     selected.sort(key=lambda x: x["start"])
     return selected
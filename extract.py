@@ -3,6 +3,7 @@ Clip extraction and vertical reframing using FFmpeg.
 Produces Shorts/TikTok/Reels-ready clips from detected highlights.
 """
 
+import functools
 import subprocess
 import time
 from collections.abc import Callable
@@ -14,6 +15,9 @@ import yaml
 from detect import _get_ffmpeg_bin
 from timer_utils import emit_log, format_elapsed
 
+# Hardware H.264 encoders tried in order when performance.use_hw_encoder is "auto"
+HW_ENCODERS = ("h264_nvenc", "h264_qsv")
+
 
 def _parse_aspect(spec: str) -> tuple[int, int]:
     """Parse 'W:H' (e.g. 9:16, 10:16) into positive integers."""
@@ -36,17 +40,25 @@ def _output_dimensions(aspect_ratio: str, base_width: int = 1080) -> tuple[int,
     return out_w, out_h
 
 
+@functools.lru_cache(maxsize=None)
 def _detect_hw_encoder(ffmpeg_path: str) -> str | None:
-    """Detect if NVENC (NVIDIA) is available. Returns encoder name or None."""
-    try:
-        r = subprocess.run(
-            [ffmpeg_path, "-hide_banner", "-encoders"],
-            capture_output=True, text=True, timeout=5
-        )
-        if "h264_nvenc" in r.stdout:
-            return "h264_nvenc"
-    except Exception:
-        pass
+    """
+    Return the first H.264 hardware encoder (NVENC, then Quick Sync) that actually works here, or None.
+    `ffmpeg -encoders` only lists what the build was compiled with (common Windows builds list both),
+    so each candidate gets a 1-frame test encode; cached, so this runs once per process.
+    """
+    for name in HW_ENCODERS:
+        try:
+            r = subprocess.run(
+                [ffmpeg_path, "-hide_banner", "-loglevel", "error",
+                 "-f", "lavfi", "-i", "nullsrc=s=256x256", "-frames:v", "1",
+                 "-c:v", name, "-f", "null", "-"],
+                capture_output=True, timeout=10,
+            )
+        except Exception:
+            continue
+        if r.returncode == 0:
+            return name
     return None
 
 
@@ -85,6 +97,15 @@ def _build_vertical_filter(
     return crop + scale_pad
 
 
+def _video_codec_args(video_encoder: str | None, crf: int, preset: str) -> list[str]:
+    """FFmpeg video codec arguments for NVENC, Quick Sync or libx264."""
+    if video_encoder == "h264_nvenc":
+        return ["-c:v", "h264_nvenc", "-preset", "p5", "-tune", "hq", "-rc", "vbr", "-cq", str(crf), "-b:v", "0"]
+    if video_encoder == "h264_qsv":
+        return ["-c:v", "h264_qsv", "-preset", "medium", "-global_quality", str(crf)]
+    return ["-c:v", "libx264", "-preset", preset, "-crf", str(crf)]
+
+
 def extract_clip(
     video_path: str,
     start_sec: float,
@@ -111,16 +132,12 @@ def extract_clip(
         emit_log(log, f"  Invalid clip aspect settings: {e}")
         return False
 
-    encoder = video_encoder or "libx264"
-    if encoder == "h264_nvenc":
-        vcodec_args = ["-c:v", "h264_nvenc", "-rc", "vbr", "-cq", str(crf), "-b:v", "0"]
-    else:
-        vcodec_args = ["-c:v", "libx264", "-preset", preset, "-crf", str(crf)]
-
+    # -ss before -i is an input-side seek: FFmpeg jumps to the nearest keyframe and decodes
+    # only from there, so encode cost scales with clip length, not with the seek offset.
     cmd = (
         [ffmpeg_path, "-y", "-ss", str(start_sec), "-i", video_path, "-t", str(duration)]
         + ["-vf", vf]
-        + vcodec_args
+        + _video_codec_args(video_encoder, crf, preset)
         + ["-c:a", "aac", "-b:a", "192k", output_path]
     )
 
@@ -135,6 +152,52 @@ def extract_clip(
         return False
 
 
+def extract_clips_batch(
+    video_path: str,
+    ranges: list[tuple[float, float]],
+    output_paths: list[str],
+    aspect_ratio: str = "9:16",
+    ffmpeg_path: str = "ffmpeg",
+    crf: int = 18,
+    preset: str = "medium",
+    video_encoder: str | None = None,
+    log: Callable[[str], None] | None = None,
+    reframe_mode: str = "fit",
+    crop_aspect: str = "9:16",
+) -> bool:
+    """
+    Extract several clips with one FFmpeg process.
+    Each clip is its own input with a fast input-side seek (-ss before -i), so only the clip
+    ranges are decoded, and each input gets its own reframe chain and output file.
+    """
+    try:
+        out_w, out_h = _output_dimensions(aspect_ratio)
+        cw, ch = _parse_aspect(crop_aspect)
+        vf = _build_vertical_filter(reframe_mode, out_w, out_h, cw, ch)
+    except ValueError as e:
+        emit_log(log, f"  Invalid clip aspect settings: {e}")
+        return False
+
+    cmd = [ffmpeg_path, "-y"]
+    for start_sec, end_sec in ranges:
+        cmd += ["-ss", str(start_sec), "-t", str(end_sec - start_sec), "-i", video_path]
+    cmd += ["-filter_complex", ";".join(f"[{k}:v]{vf}[v{k}]" for k in range(len(ranges)))]
+    vcodec_args = _video_codec_args(video_encoder, crf, preset)
+    for k, out_path in enumerate(output_paths):
+        cmd += ["-map", f"[v{k}]", "-map", f"{k}:a:0?"]
+        cmd += vcodec_args + ["-c:a", "aac", "-b:a", "192k", str(Path(out_path).resolve())]
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120 * len(ranges))
+        if result.returncode != 0 and result.stderr:
+            last_lines = result.stderr.strip().split("\n")[-3:]
+            emit_log(log, f"  FFmpeg: {' '.join(last_lines)}")
+        return result.returncode == 0
+    except Exception as e:
+        emit_log(log, f"  Error extracting clips: {e}")
+        return False
+
+
 def extract_all_clips(
     video_path: str,
     highlights: list[dict],
@@ -164,10 +227,13 @@ def extract_all_clips(
     Path(out_dir).mkdir(parents=True, exist_ok=True)
 
     video_encoder = None
-    if perf_cfg.get("use_hw_encoder", "auto") in ("auto", True):
+    use_hw = perf_cfg.get("use_hw_encoder", "auto")
+    if use_hw in HW_ENCODERS:
+        video_encoder = use_hw
+    elif use_hw in ("auto", True):
         video_encoder = _detect_hw_encoder(ffmpeg_path)
-        if video_encoder:
-            emit_log(log, "  Using NVENC hardware encoder for faster extraction")
+    if video_encoder:
+        emit_log(log, f"  Using {video_encoder} hardware encoder for faster extraction")
 
     video_stem = Path(video_path).stem
     if base_name:
@@ -200,8 +266,8 @@ def extract_all_clips(
             aspect, ffmpeg_path, crf, preset, enc, log=log,
             reframe_mode=reframe, crop_aspect=crop_asp,
         )
-        if not ok and enc == "h264_nvenc":
-            emit_log(log, "  NVENC failed, retrying with software encoder...")
+        if not ok and enc:
+            emit_log(log, f"  {enc} failed, retrying with software encoder...")
             ok = extract_clip(
                 video_path, hl["start"], hl["end"], path,
                 aspect, ffmpeg_path, crf, preset, None, log=log,
@@ -212,23 +278,57 @@ def extract_all_clips(
     start_time = time.time()
     emit_log(log, f"  Extracting {len(to_extract)} clip(s)...")
 
-    if len(to_extract) > 1 and parallel_workers > 1:
-        with ThreadPoolExecutor(max_workers=min(parallel_workers, len(to_extract))) as ex:
-            futures = {ex.submit(_extract_one, t): t for t in to_extract}
+    # Batch in groups of extract_parallel_workers clips, one FFmpeg process per group. This bounds
+    # how many encoders run at once (NVENC session caps, parallel_videos fan-out) and keeps a failure
+    # confined to its own group; clips from failed groups are retried one at a time below.
+    pending = to_extract
+    group_size = max(1, int(parallel_workers))
+    if len(to_extract) > 1 and group_size > 1 and perf_cfg.get("batch_extract", True):
+        pending = []
+        for g in range(0, len(to_extract), group_size):
+            group = to_extract[g:g + group_size]
+            ranges = [(h["start"], h["end"]) for _, h, _ in group]
+            paths = [p for _, _, p in group]
+            ok = extract_clips_batch(
+                video_path, ranges, paths,
+                aspect, ffmpeg_path, crf, preset, video_encoder, log=log,
+                reframe_mode=reframe, crop_aspect=crop_asp,
+            )
+            if not ok and video_encoder:
+                emit_log(log, f"  {video_encoder} failed, retrying with software encoder...")
+                ok = extract_clips_batch(
+                    video_path, ranges, paths,
+                    aspect, ffmpeg_path, crf, preset, None, log=log,
+                    reframe_mode=reframe, crop_aspect=crop_asp,
+                )
+                if ok:
+                    video_encoder = None  # stay on software for the remaining clips
+            if ok:
+                for idx, _, path in group:
+                    output_paths[idx] = path
+                    emit_log(log, f"    -> {Path(path).name}")
+            else:
+                pending += group
+        if pending:
+            emit_log(log, f"  Batch extraction failed for {len(pending)} clip(s), extracting them one at a time...")
+
+    if len(pending) > 1 and parallel_workers > 1:
+        with ThreadPoolExecutor(max_workers=min(parallel_workers, len(pending))) as ex:
+            futures = {ex.submit(_extract_one, t): t for t in pending}
             for fut in as_completed(futures):
                 idx, path, ok = fut.result()
                 output_paths[idx] = path if ok else None
                 emit_log(log, f"    -> {Path(path).name}" if ok else f"    -> Failed: {Path(path).name}")
     else:
-        for idx, h, out_path in to_extract:
+        for idx, h, out_path in pending:
             emit_log(log, f"  Extracting clip: {h['start']:.1f}s - {h['end']:.1f}s")
             ok = extract_clip(
                 video_path, h["start"], h["end"], out_path,
                 aspect, ffmpeg_path, crf, preset, video_encoder, log=log,
                 reframe_mode=reframe, crop_aspect=crop_asp,
             )
-            if not ok and video_encoder == "h264_nvenc":
-                emit_log(log, "  NVENC failed, retrying with software encoder...")
+            if not ok and video_encoder:
+                emit_log(log, f"  {video_encoder} failed, retrying with software encoder...")
                 ok = extract_clip(
                     video_path, h["start"], h["end"], out_path,
                     aspect, ffmpeg_path, crf, preset, None, log=log,
@@ -24,15 +24,25 @@ from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
 
-import urllib.request
+import http.client
 import ssl
 
+try:
+    import orjson
+except ImportError:  # optional: faster parsing of the per-second API payload
+    orjson = None
+
 from app_paths import project_root
 from timer_utils import emit_log
 
 # Live Client Data API - runs on port 2999 during an active LoL match
-API_BASE = "https://127.0.0.1:2999"
+API_HOST = "127.0.0.1"
+API_PORT = 2999
 EVENTS_LOG_DIR = "eventlogs"
+# Full allgamedata snapshot (roster, game clock) is refreshed this often; other polls fetch only new events
+SNAPSHOT_REFRESH_SECONDS = 60
+
+_live_conn: http.client.HTTPSConnection | None = None
 
 
 def _connect_obs(
@@ -112,17 +122,55 @@ def _build_player_maps(data):
     return by_pid, by_summoner
 
 
+def _live_client_connection() -> http.client.HTTPSConnection:
+    """Return the shared keep-alive connection to the Live Client Data API (self-signed cert)."""
+    global _live_conn
+    if _live_conn is None:
+        ctx = ssl.create_default_context()
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+        _live_conn = http.client.HTTPSConnection(API_HOST, API_PORT, context=ctx, timeout=2)
+    return _live_conn
+
+
+def _close_live_client_connection() -> None:
+    global _live_conn
+    if _live_conn is not None:
+        _live_conn.close()
+        _live_conn = None
+
+
+def _live_client_get(path: str) -> dict | None:
+    """GET a Live Client Data API path and parse the JSON body. Returns None if game not running."""
+    # One persistent connection: avoids a TCP + TLS handshake on every 1 s poll.
+    # A stale keep-alive socket (client restarted between games) is retried once on a fresh one.
+    for attempt in range(2):
+        conn = _live_client_connection()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            raw = resp.read()
+            if resp.status != 200:
+                return None
+            return orjson.loads(raw) if orjson else json.loads(raw)
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+            _close_live_client_connection()
+            if attempt:
+                return None
+        except Exception:
+            _close_live_client_connection()
+            return None
+    return None
+
+
 def fetch_live_data():
     """Fetch all game data from Live Client Data API. Returns None if game not running."""
-    ctx = ssl.create_default_context()
-    ctx.check_hostname = False
-    ctx.verify_mode = ssl.CERT_NONE
-    try:
-        req = urllib.request.Request(f"{API_BASE}/liveclientdata/allgamedata")
-        with urllib.request.urlopen(req, timeout=2, context=ctx) as resp:
-            return json.loads(resp.read().decode())
-    except Exception:
-        return None
+    return _live_client_get("/liveclientdata/allgamedata")
+
+
+def fetch_event_data(next_event_id: int = 0):
+    """Fetch only events with EventID >= next_event_id ({"Events": [...]}). Returns None if game not running."""
+    return _live_client_get(f"/liveclientdata/eventdata?eventID={int(next_event_id)}")
 
 
 def _load_config() -> dict:
@@ -291,9 +339,25 @@ def run_session(
     emit_log(log, "")
 
     output_file: Path | None = None
+    data = None  # latest allgamedata snapshot, None while the Live Client is unreachable
+    snapshot_at = 0.0
+    snapshot_game_time = 0.0
+    next_event_id = 0
+    player_maps = None  # built lazily from the current snapshot, shared by every kill until the next refresh
     try:
         while not stop_event.is_set():
-            data = fetch_live_data()
+            now = time.time()
+            # Keep taking full snapshots until the game clock runs (loading screen), then only every minute
+            if data is None or snapshot_game_time <= 0 or now - snapshot_at >= SNAPSHOT_REFRESH_SECONDS:
+                data = fetch_live_data()
+                snapshot_at = now
+                player_maps = None
+                events_data = data.get("events") if data is not None else None
+                snapshot_game_time = float(((data or {}).get("gameData") or {}).get("gameTime") or 0)
+            else:
+                events_data = fetch_event_data(next_event_id)
+                if events_data is None:
+                    data = None
             if data is None:
                 was_disconnected = True
                 if obs_req and auto_stop_recording and lol_match_in_progress and not obs_stop_done:
@@ -307,6 +371,7 @@ def run_session(
                 disconnect_since = None
                 if was_disconnected and session_start is not None:
                     seen_event_ids.clear()
+                    next_event_id = 0
                     lol_match_in_progress = False
                     obs_start_done = False
                     obs_stop_done = False
@@ -319,7 +384,6 @@ def run_session(
                     session_start = time.time()
                     emit_log(log, f"Connected to game at {datetime.now().strftime('%H:%M:%S')}")
 
-                events_data = data.get("events")
                 if isinstance(events_data, str):
                     try:
                         events_data = json.loads(events_data)
@@ -328,13 +392,15 @@ def run_session(
                 events_data = events_data or {}
                 events_list = events_data.get("Events") or []
 
-                game_data = data.get("gameData") or {}
-                current_game_time = game_data.get("gameTime", 0)
+                # Between snapshots the game clock is extrapolated from the last one
+                current_game_time = snapshot_game_time + (now - snapshot_at) if snapshot_game_time > 0 else 0.0
                 if game_start_time is None and current_game_time > 0:
                     game_start_time = current_game_time
 
                 if local_player_champion is None:
-                    _, champion_by_summoner = _build_player_maps(data)
+                    if player_maps is None:
+                        player_maps = _build_player_maps(data)
+                    _, champion_by_summoner = player_maps
                     active = data.get("activePlayer") or data.get("active_player") or {}
                     if isinstance(active, dict):
                         my_name = active.get("summonerName") or active.get("summoner_name") or active.get("gameName") or active.get("riotId") or ""
@@ -348,6 +414,7 @@ def run_session(
                     if eid is None or eid in seen_event_ids:
                         continue
                     seen_event_ids.add(eid)
+                    next_event_id = max(next_event_id, eid + 1)
 
                     event_name = ev.get("EventName", "")
                     event_time = ev.get("EventTime", 0)
@@ -363,7 +430,9 @@ def run_session(
                         obs_pending_start_deadline = None
                         try_obs_stop("GameEnd event")
                     elif event_name == "ChampionKill":
-                        player_by_pid, champion_by_summoner = _build_player_maps(data)
+                        if player_maps is None:
+                            player_maps = _build_player_maps(data)
+                        player_by_pid, champion_by_summoner = player_maps
                         killer_id = ev.get("KillerID") or ev.get("killerId")
                         victim_id = ev.get("VictimID") or ev.get("victimId")
                         killer_name = ev.get("KillerName") or ev.get("killerName")
@@ -401,8 +470,7 @@ def run_session(
                     and not obs_start_done
                     and data is not None
                 ):
-                    gt_join = float((data.get("gameData") or {}).get("gameTime") or 0)
-                    if gt_join >= mid_game_join_sec:
+                    if current_game_time >= mid_game_join_sec:
                         lol_match_in_progress = True
                         if not mid_join_notice_done:
                             emit_log(
@@ -435,6 +503,8 @@ def run_session(
 
     except KeyboardInterrupt:
         emit_log(log, "\nStopping...")
+    finally:
+        _close_live_client_connection()
 
     if events_log:
         output = {
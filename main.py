@@ -6,12 +6,11 @@ CLI: python main.py [video ...]  (no args opens file picker; default folder from
 GUI: python run_main_gui.py
 """
 
+import multiprocessing
 import sys
 from pathlib import Path
 
-from app_paths import project_root
-from detect import load_config
-from pipeline import process_videos
+from app_paths import load_config, project_root
 from ui_dialogs import select_video_files
 
 
@@ -43,8 +42,12 @@ def main() -> None:
                 print("   Place .mp4/.mkv in that folder or pass paths on the command line.")
                 sys.exit(1)
 
+    # Imported after the file picker so the dialog isn't held up by the analysis/extraction stack
+    from pipeline import process_videos
+
     process_videos(videos, config)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # worker processes in frozen (PyInstaller) builds
     main()
@@ -1,7 +1,9 @@
 """Core clip workflow: detect → extract → optional uploads. Used by CLI and GUI."""
 
+import os
 import time
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from app_paths import project_root
@@ -67,6 +69,11 @@ def run_uploads(
     ttk_enabled = config.get("tiktok", {}).get("enabled")
     ig_enabled = config.get("instagram", {}).get("enabled")
 
+    if yt_enabled or ttk_enabled or ig_enabled:
+        from upload_utils import prefetch
+
+        prefetch(to_upload)
+
     if yt_enabled:
         emit_log(log, f"\nUploading {len(to_upload)} clip(s) to YouTube Shorts...")
         t0 = time.perf_counter()
@@ -107,6 +114,26 @@ def run_uploads(
         (project_root() / "clip_counter.txt").write_text(str(clip_nums[-1] + 1))
 
 
+def _offer_uploads(
+    outputs: list[str],
+    config: dict,
+    selector: Callable[[list[str]], list[str]],
+    log: Callable[[str], None] | None,
+) -> None:
+    """Ask which of a video's clips to upload (if any platform is enabled) and upload them."""
+    if outputs and (
+        config.get("youtube", {}).get("enabled")
+        or config.get("tiktok", {}).get("enabled")
+        or config.get("instagram", {}).get("enabled")
+    ):
+        to_upload = selector(outputs)
+        if to_upload:
+            clip_nums = clip_nums_for_upload_count(config, len(to_upload))
+            run_uploads(to_upload, config, clip_nums, log)
+        else:
+            emit_log(log, "\nSkipped upload (none selected or cancelled)")
+
+
 def process_videos(
     videos: list[Path],
     config: dict,
@@ -116,19 +143,33 @@ def process_videos(
     """
     Full workflow for each video: detect highlights, extract clips, optional upload dialog.
     upload_selector: if None, uses select_clips_to_upload (blocking Tk on main thread).
+    CLI (no log callback): several videos are detected/extracted in worker processes
+    (performance.parallel_videos); upload dialogs stay on the main thread as each finishes.
     """
     selector = upload_selector or select_clips_to_upload
 
+    workers = 1
+    if log is None and len(videos) > 1:
+        workers = config.get("performance", {}).get("parallel_videos") or max(1, (os.cpu_count() or 2) // 2)
+        workers = min(int(workers), len(videos))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(process_one_video, video_path, config): video_path for video_path in videos}
+            failed = []
+            for fut in as_completed(futures):
+                # One bad video must not stop the others' clips from being offered for upload
+                try:
+                    outputs = fut.result()
+                except Exception as e:
+                    failed.append(futures[fut])
+                    emit_log(log, f"\nProcessing failed for {futures[fut]}: {e}")
+                    continue
+                _offer_uploads(outputs, config, selector, log)
+        if failed:
+            emit_log(log, f"\n{len(failed)} of {len(videos)} video(s) failed: " + ", ".join(Path(p).name for p in failed))
+        return
+
     for video_path in videos:
         outputs = process_one_video(video_path, config, log)
-        if outputs and (
-            config.get("youtube", {}).get("enabled")
-            or config.get("tiktok", {}).get("enabled")
-            or config.get("instagram", {}).get("enabled")
-        ):
-            to_upload = selector(outputs)
-            if to_upload:
-                clip_nums = clip_nums_for_upload_count(config, len(to_upload))
-                run_uploads(to_upload, config, clip_nums, log)
-            else:
-                emit_log(log, "\nSkipped upload (none selected or cancelled)")
+        _offer_uploads(outputs, config, selector, log)
@@ -7,22 +7,39 @@ Note: Unverified apps may only post to private accounts.
 import hashlib
 import json
 import os
+import re
 import secrets
+import selectors
+import socket
+import threading
 import time
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from app_paths import project_root
-from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.parse import parse_qs, urlencode
 
 import requests
 
 from timer_utils import emit_log, format_elapsed
+from upload_utils import RateLimiter, clip_problem, write_text_atomic
 
 TIKTOK_TOKEN_FILE = "tiktok_token.json"
 TIKTOK_UPLOADED_FILE = "tiktok_uploaded.json"
 AUTH_URL = "https://www.tiktok.com/v2/auth/authorize/"
 TOKEN_URL = "https://open.tiktokapis.com/v2/oauth/token/"
+TIKTOK_REQUESTS_PER_MINUTE = 6  # Content Posting API video init limit, per user token
+
+# Authenticated clients reused across calls, keyed by client_key
+_CLIENT_CACHE: dict[str, object] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _token_expiring(token_data: dict | None, margin: float = 60.0) -> bool:
+    """True when the stored token has an expires_at within margin seconds (tokens without one never expire here)."""
+    expires_at = (token_data or {}).get("expires_at")
+    return expires_at is not None and float(expires_at) - time.time() < margin
 
 
 def _load_uploaded_paths(tracking_path: Path) -> set[str]:
@@ -43,6 +60,89 @@ def _mark_uploaded(tracking_path: Path, path: str) -> None:
     tracking_path.write_text(json.dumps({"paths": sorted(paths)}, indent=2))
 
 
+def _save_token(token_path: Path, token_data: dict) -> dict:
+    """Persist the token fields we need plus an absolute expires_at (5 min early). Returns the stored dict."""
+    data = {
+        "access_token": token_data["access_token"],
+        "refresh_token": token_data["refresh_token"],
+        "open_id": token_data["open_id"],
+        "expires_at": time.time() + float(token_data.get("expires_in", 86400)) - 300,
+    }
+    # Compact, owner-only, and atomic: a crash mid-write can't leave a truncated token file
+    write_text_atomic(token_path, json.dumps(data, separators=(",", ":")), mode=0o600)
+    return data
+
+
+def _refresh_access_token(client_key: str, client_secret: str, refresh_token: str) -> dict:
+    """Exchange a refresh_token for a new access token. Raises RuntimeError on failure."""
+    resp = requests.post(
+        TOKEN_URL,
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        data={
+            "client_key": client_key,
+            "client_secret": client_secret,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        },
+        timeout=15,
+    )
+    token_data = resp.json()
+    if "error" in token_data or "access_token" not in token_data:
+        err = token_data.get("error_description", token_data.get("error", "no access_token"))
+        raise RuntimeError(f"TikTok token refresh failed: {err}")
+    return token_data
+
+
+_CALLBACK_PAGE = b"<h1>Authorization complete. You can close this tab.</h1>"
+_CALLBACK_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n"
+    b"Content-Length: " + str(len(_CALLBACK_PAGE)).encode() + b"\r\n\r\n" + _CALLBACK_PAGE
+)
+_REQUEST_LINE_RE = re.compile(r"GET /[^? ]*\?([^ ]+) HTTP/")
+
+
+def _wait_for_oauth_code(
+    log: Callable[[str], None] | None, port: int = 8080, timeout: float = 300.0
+) -> str | None:
+    """
+    Accept browser requests on 127.0.0.1:port until one carries ?code= (favicon etc. ignored; max 10).
+    Raises RuntimeError if nothing arrives within timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as srv, selectors.DefaultSelector() as sel:
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        srv.bind(("127.0.0.1", port))
+        srv.listen(1)
+        sel.register(srv, selectors.EVENT_READ)
+        handled = 0
+        while handled < 10:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"Timed out waiting for TikTok OAuth callback after {timeout:.0f}s")
+            if not sel.select(timeout=min(1.0, remaining)):
+                continue
+            conn, _ = srv.accept()
+            handled += 1
+            with conn:
+                conn.settimeout(5.0)  # browsers open speculative connections that never send a request
+                try:
+                    data = conn.recv(4096).decode("latin-1")
+                    conn.sendall(_CALLBACK_RESPONSE)
+                except OSError:
+                    continue
+            m = _REQUEST_LINE_RE.match(data)
+            if not m:
+                continue
+            params = parse_qs(m.group(1))
+            error = params.get("error", [None])[0]
+            if error:
+                emit_log(log, f"  TikTok callback error: {error} - {params.get('error_description', [None])[0]}")
+            code = params.get("code", [None])[0]
+            if code:
+                return code
+    return None
+
+
 def _pkce_pair():
     """Generate code_verifier and code_challenge. TikTok requires HEX encoding for code_challenge (not base64url)."""
     code_verifier = secrets.token_urlsafe(64)[:64]  # 64 chars
@@ -69,13 +169,35 @@ def get_tiktok_client(config: dict, log: Callable[[str], None] | None = None):
             "Get them from https://developers.tiktok.com/"
         )
 
+    cached = _CLIENT_CACHE.get(client_key)
+    if cached is not None and cached.access_token and not _token_expiring(cached.token_data):
+        return cached
+    # Single flight: one caller refreshes (or runs the browser flow); the others wait here
+    # and then pick up its client from the cache
+    with _CLIENT_LOCK:
+        cached = _CLIENT_CACHE.get(client_key)
+        if cached is not None and cached.access_token and not _token_expiring(cached.token_data):
+            return cached
+        tik = _load_or_authorize(TikTok, ttk_cfg, client_key, client_secret, redirect_uri, log)
+        _CLIENT_CACHE[client_key] = tik
+        return tik
+
+
+def _load_or_authorize(
+    TikTok, ttk_cfg: dict, client_key: str, client_secret: str, redirect_uri: str,
+    log: Callable[[str], None] | None,
+):
+    """Client from tiktok_token.json (refreshed if expired), else from a fresh browser OAuth flow."""
     token_path = project_root() / TIKTOK_TOKEN_FILE
 
-    # Try loading existing token
+    # Try loading existing token; refresh it only once its stored expires_at has passed
     if token_path.exists():
         try:
             with open(token_path) as f:
                 data = json.load(f)
+            if _token_expiring(data, margin=0) and data.get("refresh_token"):
+                emit_log(log, "  TikTok: refreshing access token...")
+                data = _save_token(token_path, _refresh_access_token(client_key, client_secret, data["refresh_token"]))
             tik = TikTok(client_key=client_key, client_secret=client_secret, redirect_uri=redirect_uri)
             tik.access_token = data.get("access_token")
             tik.refresh_token = data.get("refresh_token")
@@ -102,40 +224,8 @@ def get_tiktok_client(config: dict, log: Callable[[str], None] | None = None):
     emit_log(log, f"  Troubleshooting: client_key={client_key[:8]}... redirect_uri={redirect_uri}")
     emit_log(log, "  If client_key error: Add Login Kit product + this exact redirect_uri in Login Kit settings.")
 
-    # Simple local server to catch callback
-    from http.server import HTTPServer, BaseHTTPRequestHandler
-
-    code_received = []
-
-    class CallbackHandler(BaseHTTPRequestHandler):
-        def do_GET(self):
-            parsed = urlparse(self.path)
-            params = parse_qs(parsed.query)
-            code = params.get("code", [None])[0]
-            error = params.get("error", [None])[0]
-            error_desc = params.get("error_description", [None])[0]
-            if error:
-                emit_log(log, f"  TikTok callback error: {error} - {error_desc}")
-            if code:
-                code_received.append(code)
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(b"<h1>Authorization complete. You can close this tab.</h1>")
-
-        def log_message(self, *args):
-            pass
-
-    server = HTTPServer(("127.0.0.1", 8080), CallbackHandler)
     emit_log(log, "  TikTok: waiting for authorization (visit the URL above)...")
-    # Handle requests until we get one with code (ignore favicon, etc.)
-    for _ in range(10):
-        server.handle_request()
-        if code_received:
-            break
-    server.server_close()
-
-    code = code_received[0] if code_received else None
+    code = _wait_for_oauth_code(log, timeout=float(ttk_cfg.get("oauth_timeout_sec", 300)))
     if not code:
         raise RuntimeError(
             "No authorization code received. Check that redirect_uri in Login Kit exactly matches "
@@ -169,12 +259,7 @@ def get_tiktok_client(config: dict, log: Callable[[str], None] | None = None):
 
     # Create TikTok client for create_video (library handles upload)
     tik = TikTok(client_key=client_key, client_secret=client_secret, redirect_uri=redirect_uri)
-    with open(token_path, "w") as f:
-        json.dump({
-            "access_token": token_data["access_token"],
-            "refresh_token": token_data["refresh_token"],
-            "open_id": token_data["open_id"],
-        }, f, indent=2)
+    token_data["expires_at"] = _save_token(token_path, token_data)["expires_at"]
     tik.access_token = token_data["access_token"]
     tik.refresh_token = token_data["refresh_token"]
     tik.open_id = token_data["open_id"]
@@ -189,7 +274,7 @@ def upload_clips(
     champion: str = "",
     log: Callable[[str], None] | None = None,
 ) -> tuple[list[str], list[int]]:
-    """Upload clips to TikTok. Returns (publish_ids, successfully used clip numbers). Pass clip_nums to share numbering with YouTube. champion from game_events for title_template {champion}."""
+    """Upload clips to TikTok. Returns (publish_ids, successfully used clip numbers). Pass clip_nums to share numbering with YouTube. champion from game_events for title_template {champion}. Uploads run concurrently (tiktok.max_concurrent_uploads, default 3)."""
     ttk_cfg = config.get("tiktok", {})
     if not ttk_cfg.get("enabled", False):
         return [], []
@@ -198,7 +283,8 @@ def upload_clips(
     creator = ttk_cfg.get("creator_name", "joes9987")
     champ_suffix = f" with {champion}" if champion else ""
 
-    counter_path = project_root() / "clip_counter.txt"
+    root = project_root()
+    counter_path = root / "clip_counter.txt"
     if clip_nums is not None:
         clip_numbers = clip_nums
     else:
@@ -207,14 +293,18 @@ def upload_clips(
             start = int(counter_path.read_text().strip()) if counter_path.exists() else counter_start
         except (ValueError, OSError):
             start = counter_start
-        clip_numbers = [start + i for i in range(len(clip_paths))]
+        clip_numbers = range(start, start + len(clip_paths))
 
-    tracking_path = project_root() / TIKTOK_UPLOADED_FILE
+    tracking_path = root / TIKTOK_UPLOADED_FILE
     uploaded_set = _load_uploaded_paths(tracking_path)
 
-    # Filter out already-uploaded clips
+    # Filter out already-uploaded clips, and bad files before we spend time authenticating
     to_upload: list[tuple[str, int]] = []
     for i, path in enumerate(clip_paths):
+        problem = clip_problem(path)
+        if problem:
+            emit_log(log, f"  Skipping ({problem}): {Path(path).name}")
+            continue
         resolved = str(Path(path).resolve())
         clip_num = clip_numbers[i] if i < len(clip_numbers) else clip_numbers[-1] + i
         if resolved in uploaded_set:
@@ -229,37 +319,69 @@ def upload_clips(
     tik = get_tiktok_client(config, log=log)
     privacy = ttk_cfg.get("privacy", "PUBLIC_TO_EVERYONE")
 
-    uploaded = []
-    success_clip_nums = []
-    for i, (path, clip_num) in enumerate(to_upload):
-        title = title_template.format(
-            num=clip_num, n=i + 1, total=len(to_upload),
+    total = len(to_upload)
+    # Titles and display names are fixed per run: build them once, outside the workers
+    titles = [
+        title_template.format(
+            num=clip_num, n=i + 1, total=total,
             champion=champion, ChampionName=champion,
             champion_suffix=champ_suffix,
             creator=creator, username=creator,
         )
-        emit_log(log, f"  Uploading to TikTok {i+1}/{len(to_upload)} (#{clip_num}): {Path(path).name}")
+        for i, (_, clip_num) in enumerate(to_upload)
+    ]
+    names = [Path(path).name for path, _ in to_upload]
+    max_workers = max(1, min(int(ttk_cfg.get("max_concurrent_uploads", 3)), total))
+    limiter = RateLimiter(ttk_cfg.get("requests_per_minute", TIKTOK_REQUESTS_PER_MINUTE))
+    lock = threading.Lock()  # guards the uploaded-tracking file
+
+    def _upload_one(i: int, path: str, clip_num: int) -> tuple[int, str | None, Exception | None]:
+        emit_log(log, f"  Uploading to TikTok {i+1}/{total} (#{clip_num}): {names[i]}")
         clip_start = time.perf_counter()
+        publish_id = None
+        # Everything stays inside the try: an odd response shape or a failed tracking write must
+        # not escape the worker and discard the other uploads' results
         try:
+            limiter.acquire()
             resp = tik.create_video(
-                title=title[:150],
+                title=titles[i][:150],
                 source="FILE_UPLOAD",
                 upload_type="POST_VIDEO_FILE",
                 privacy_level=privacy,
                 video_path=path,
             )
             if resp and resp.get("initial_response", {}).get("data", {}).get("publish_id"):
-                uploaded.append(resp["initial_response"]["data"]["publish_id"])
-                success_clip_nums.append(clip_num)
-                _mark_uploaded(tracking_path, path)
+                publish_id = resp["initial_response"]["data"]["publish_id"]
+                with lock:
+                    _mark_uploaded(tracking_path, path)
                 dt = time.perf_counter() - clip_start
-                emit_log(log, f"    -> Posted to TikTok  ({format_elapsed(dt)})")
-            else:
-                err = resp.get("error", resp.get("initial_response", {}).get("error", {})) if isinstance(resp, dict) else {}
-                emit_log(log, f"    -> Failed: {err.get('message', resp)}")
+                emit_log(log, f"    -> #{clip_num} Posted to TikTok  ({format_elapsed(dt)})")
+                return i, publish_id, None
+            err = resp.get("error", resp.get("initial_response", {}).get("error", {})) if isinstance(resp, dict) else {}
+            emit_log(log, f"    -> #{clip_num} Failed: {err.get('message', resp)}")
+            return i, None, None
         except Exception as e:
-            emit_log(log, f"    -> Error: {e}")
-    if clip_nums is None and success_clip_nums:
-        with open(counter_path, "w") as f:
-            f.write(str(max(success_clip_nums) + 1))
+            emit_log(log, f"    -> #{clip_num} Error: {e}")
+            return i, publish_id, e  # a posted clip still counts even if tracking it failed
+
+    # Paced submission: one shared rate limit, and each batch finishes before the next starts
+    batch_size = max(1, int(ttk_cfg.get("batch_size", 10)))
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            for batch_start in range(0, total, batch_size):
+                futures = [
+                    ex.submit(_upload_one, i, path, clip_num)
+                    for i, (path, clip_num) in enumerate(to_upload[batch_start:batch_start + batch_size], batch_start)
+                ]
+                results.extend(fut.result() for fut in as_completed(futures))
+    finally:
+        # Persist the counter once, even if the run is interrupted part-way
+        posted_nums = [to_upload[i][1] for i, pid, _ in results if pid]
+        if clip_nums is None and posted_nums:
+            write_text_atomic(counter_path, str(max(posted_nums) + 1))
+    results.sort(key=lambda r: r[0])
+
+    uploaded = [pid for _, pid, _ in results if pid]
+    success_clip_nums = [to_upload[i][1] for i, pid, _ in results if pid]
     return uploaded, success_clip_nums
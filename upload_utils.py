@@ -0,0 +1,87 @@
+"""
+Shared helpers for the YouTube / TikTok upload modules.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+
+def write_text_atomic(path: Path, text: str, mode: int | None = None) -> None:
+    """
+    Write text to a sibling .tmp file, then os.replace it over path (readers never see a torn file).
+    mode (e.g. 0o600 for secrets) is set when the temp file is created, so the content is never
+    readable with looser permissions.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)  # a leftover .tmp would keep its old permissions
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666 if mode is None else mode)
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def clip_problem(path: str) -> str | None:
+    """Cheap local check before any network I/O: None if path looks like an uploadable MP4, else why not."""
+    try:
+        if os.stat(path).st_size == 0:
+            return "empty file"
+        with open(path, "rb") as f:
+            head = f.read(12)
+    except OSError as e:
+        return e.strerror or "unreadable"
+    if b"ftyp" not in head:
+        return "not an MP4"
+    return None
+
+
+def prefetch(paths: list[str]) -> None:
+    """
+    Ask the kernel to start reading clips into the page cache (POSIX_FADV_WILLNEED) and return at once.
+    The readahead overlaps with OAuth/setup, and every platform uploading the same clip then reads
+    warm pages. No-op where posix_fadvise is unavailable (Windows).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class RateLimiter:
+    """Sliding-window limiter: at most requests_per_minute acquire() calls in any 60 s. Thread-safe."""
+
+    def __init__(self, requests_per_minute: int, period: float = 60.0) -> None:
+        self._max = int(requests_per_minute)
+        self._period = period
+        self._stamps: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until another request is allowed (no-op when requests_per_minute <= 0)."""
+        if self._max <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._stamps and now - self._stamps[0] >= self._period:
+                    self._stamps.popleft()
+                if len(self._stamps) < self._max:
+                    self._stamps.append(now)
+                    return
+                wait = self._period - (now - self._stamps[0])
+            time.sleep(wait)
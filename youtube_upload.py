@@ -3,29 +3,47 @@ YouTube Shorts upload for CreatorAssistant.
 Uses YouTube Data API v3 with OAuth 2.0. Vertical videos are auto-detected as Shorts.
 """
 
+import asyncio
 import contextlib
+import mmap
 import os
 import random
+import threading
 import time
 from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from app_paths import project_root
 
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import Resource, build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaIoBaseUpload, build_http
 
 from timer_utils import emit_log, format_elapsed
+from upload_utils import RateLimiter, clip_problem, write_text_atomic
 
 SCOPES = ["https://www.googleapis.com/auth/youtube.upload"]
 CLIENT_SECRETS_FILE = "client_secrets.json"
 TOKEN_FILE = "youtube_token.json"
 CLIP_COUNTER_FILE = "clip_counter.txt"
 UPLOADED_TRACKING_FILE = "youtube_uploaded.json"
+TOKEN_REFRESH_SKEW = timedelta(minutes=5)
+RESUMABLE_THRESHOLD = 64 * 1024 * 1024  # smaller clips go up in one multipart request
+UPLOAD_RETRIES = 3  # single-shot uploads (googleapiclient's built-in retry)
+MAX_CHUNK_RETRIES = 5  # resumable uploads, across the whole session
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+# Authenticated objects reused across calls, keyed by resolved (secrets_path, token_path)
+_YT_CREDS_CACHE: dict[tuple[str, str], Credentials] = {}
+_YT_SERVICE_CACHE: dict[tuple[str, str], tuple[Resource, Credentials]] = {}
+_AUTH_LOCK = threading.Lock()
 
 
 class _StdoutLinesToLog:
@@ -51,42 +69,136 @@ class _StdoutLinesToLog:
             self._buf = ""
 
 
+def _resolve_auth_paths(
+    secrets_path: str | None, token_path: str, script_dir: str | Path | None
+) -> tuple[str, str]:
+    """Absolute (secrets_path, token_path); relative names live in script_dir / project root."""
+    base = Path(script_dir).resolve() if script_dir else project_root()
+    secrets_path = secrets_path or CLIENT_SECRETS_FILE
+    if not Path(secrets_path).is_absolute():
+        secrets_path = str(base / Path(secrets_path).name)
+    token_path = str(base / Path(token_path).name) if not Path(token_path).is_absolute() else token_path
+    return secrets_path, token_path
+
+
+def _expires_soon(creds: Credentials) -> bool:
+    """True when the access token is missing or within TOKEN_REFRESH_SKEW of its expiry."""
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return False
+    # google-auth keeps expiry as a naive UTC datetime
+    return creds.expiry - datetime.now(timezone.utc).replace(tzinfo=None) < TOKEN_REFRESH_SKEW
+
+
+def get_youtube_credentials(
+    secrets_path: str | None = None,
+    token_path: str = TOKEN_FILE,
+    script_dir: str | Path | None = None,
+    log: Callable[[str], None] | None = None,
+) -> Credentials:
+    """Load, refresh, or obtain (browser OAuth) YouTube upload credentials. Cached per token file."""
+    key = _resolve_auth_paths(secrets_path, token_path, script_dir)
+    secrets_path, token_path = key
+
+    creds = _YT_CREDS_CACHE.get(key)
+    if creds is not None and not _expires_soon(creds):
+        return creds
+    # Single flight: one thread refreshes (or runs the browser flow); the others wait here
+    # and then find its fresh credentials in the cache instead of refreshing again
+    with _AUTH_LOCK:
+        creds = _YT_CREDS_CACHE.get(key)
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+        # Refresh lazily: only when the stored expiry is close, not on every call
+        if creds is None or _expires_soon(creds):
+            if creds and creds.refresh_token:
+                emit_log(log, "  YouTube: refreshing access token...")
+                creds.refresh(Request())
+            else:
+                if not os.path.exists(secrets_path):
+                    raise FileNotFoundError(
+                        f"Missing {secrets_path}. Get OAuth credentials from "
+                        "https://console.cloud.google.com/ → APIs & Services → Credentials → Create OAuth 2.0 Client ID "
+                        "(Desktop app). Download JSON and save as client_secrets.json"
+                    )
+                flow = InstalledAppFlow.from_client_secrets_file(secrets_path, SCOPES)
+                emit_log(log, "  YouTube: starting OAuth (browser should open; if not, use the URL below).")
+                out = _StdoutLinesToLog(log)
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                    creds = flow.run_local_server(port=0)
+                out.flush()
+            write_text_atomic(Path(token_path), creds.to_json(), mode=0o600)
+        _YT_CREDS_CACHE[key] = creds
+        return creds
+
+
 def get_youtube_service(
     secrets_path: str | None = None,
     token_path: str = TOKEN_FILE,
     script_dir: str | Path | None = None,
     log: Callable[[str], None] | None = None,
 ):
-    """Authenticate and return a YouTube API service object."""
-    base = Path(script_dir).resolve() if script_dir else project_root()
-    secrets_path = secrets_path or CLIENT_SECRETS_FILE
-    if not Path(secrets_path).is_absolute():
-        secrets_path = str(base / Path(secrets_path).name)
-    token_path = str(base / Path(token_path).name) if not Path(token_path).is_absolute() else token_path
+    """Authenticate and return a YouTube API service object (reused while its credentials are)."""
+    key = _resolve_auth_paths(secrets_path, token_path, script_dir)
+    creds = get_youtube_credentials(secrets_path, token_path, script_dir, log)
+    cached = _YT_SERVICE_CACHE.get(key)
+    if cached is not None and cached[1] is creds:
+        return cached[0]
+    youtube = _build_service(creds)
+    _YT_SERVICE_CACHE[key] = (youtube, creds)
+    return youtube
+
+
+def _build_service(creds: Credentials) -> Resource:
+    # One keep-alive httplib2.Http per service, so successive uploads reuse the TLS connection.
+    # httplib2 isn't thread-safe: concurrent callers need a service each.
+    # Bundled discovery document: no network fetch, no file-cache warning.
+    # build_http() drops 308 from redirect_codes: resumable chunks are answered with
+    # "308 Resume Incomplete" (no Location), which a bare httplib2.Http treats as a broken redirect.
+    base_http = build_http()
+    base_http.timeout = 30
+    http = AuthorizedHttp(creds, http=base_http)
+    return build("youtube", "v3", http=http, cache_discovery=False, static_discovery=True)
+
+
+def video_body(
+    title: str,
+    description: str = "",
+    tags: list | None = None,
+    privacy: str = "private",
+    category_id: str = "20",  # Gaming
+) -> dict:
+    """videos.insert request body (snippet + status), with YouTube's length limits applied."""
+    return {
+        "snippet": {
+            "title": title[:100],
+            "description": description[:5000] or "League of Legends highlight clip",
+            "tags": tags or ["League of Legends", "Gaming", "Shorts"],
+            "categoryId": category_id,
+        },
+        "status": {"privacyStatus": privacy},
+    }
+
 
-    creds = None
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            emit_log(log, "  YouTube: refreshing access token...")
-            creds.refresh(Request())
-        else:
-            if not os.path.exists(secrets_path):
-                raise FileNotFoundError(
-                    f"Missing {secrets_path}. Get OAuth credentials from "
-                    "https://console.cloud.google.com/ → APIs & Services → Credentials → Create OAuth 2.0 Client ID "
-                    "(Desktop app). Download JSON and save as client_secrets.json"
-                )
-            flow = InstalledAppFlow.from_client_secrets_file(secrets_path, SCOPES)
-            emit_log(log, "  YouTube: starting OAuth (browser should open; if not, use the URL below).")
-            out = _StdoutLinesToLog(log)
-            with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
-                creds = flow.run_local_server(port=0)
-            out.flush()
-        with open(token_path, "w") as f:
-            f.write(creds.to_json())
-    return build("youtube", "v3", credentials=creds)
+@contextlib.contextmanager
+def _mapped_media(file_path: str, chunksize_mb: int):
+    """
+    Yield a MediaIoBaseUpload reading file_path through a read-only mmap (no per-chunk
+    buffered file reads). Single-shot below RESUMABLE_THRESHOLD, resumable above.
+    """
+    with open(file_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"Clip is empty: {file_path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield MediaIoBaseUpload(
+                mm,
+                mimetype="video/mp4",
+                chunksize=int(chunksize_mb) * 1024 * 1024,
+                resumable=len(mm) >= RESUMABLE_THRESHOLD,
+            )
 
 
 def upload_video(
@@ -97,39 +209,43 @@ def upload_video(
     privacy: str = "private",
     category_id: str = "20",  # Gaming
     youtube=None,
+    chunksize_mb: int = 8,
 ) -> str | None:
     """
-    Upload a video to YouTube. Returns the video ID on success, None on failure.
+    Upload a video to YouTube. Returns the video ID; re-raises the last error once retries are exhausted.
     Privacy: 'public', 'private', or 'unlisted'
+    Files under RESUMABLE_THRESHOLD are sent in a single request; larger ones use a
+    resumable session with chunksize_mb chunks.
     """
     if youtube is None:
         youtube = get_youtube_service()
-    body = {
-        "snippet": {
-            "title": title[:100],
-            "description": description[:5000] or "League of Legends highlight clip",
-            "tags": tags or ["League of Legends", "Gaming", "Shorts"],
-            "categoryId": category_id,
-        },
-        "status": {"privacyStatus": privacy},
-    }
-
-    media = MediaFileUpload(file_path, mimetype="video/mp4", resumable=True)
-    request = youtube.videos().insert(part="snippet,status", body=body, media_body=media)
-
-    retries = 0
-    max_retries = 5
-    while retries < max_retries:
-        try:
-            response = request.execute()
-            return response.get("id")
-        except HttpError as e:
-            if e.resp.status in (500, 502, 503, 504):
+    body = video_body(title, description, tags, privacy, category_id)
+
+    with _mapped_media(file_path, chunksize_mb) as media:
+        request = youtube.videos().insert(part="snippet,status", body=body, media_body=media)
+        if not media.resumable():
+            # Single request: googleapiclient's own retry re-sends the whole (small) body
+            return request.execute(num_retries=UPLOAD_RETRIES).get("id")
+
+        # Resumable: retry here, not via next_chunk(num_retries=...), which re-sends an already
+        # consumed chunk stream. After a failure googleapiclient asks the server for its offset
+        # on the next call, so each retry resumes from the last acknowledged byte.
+        retries = 0
+        last_sleep = 1.0
+        response = None
+        while response is None:
+            try:
+                _, response = request.next_chunk(num_retries=0)
+            except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+                if isinstance(e, HttpError) and e.resp.status not in RETRYABLE_STATUSES:
+                    raise
                 retries += 1
-                time.sleep(random.uniform(1, 2**retries))
-            else:
-                raise
-    return None
+                if retries > MAX_CHUNK_RETRIES:
+                    raise
+                # Decorrelated jitter: keeps parallel workers from retrying in lockstep
+                last_sleep = min(30.0, random.uniform(1.0, last_sleep * 3))
+                time.sleep(last_sleep)
+        return response.get("id")
 
 
 def _get_next_clip_num(counter_path: Path, start: int) -> int:
@@ -144,8 +260,7 @@ def _get_next_clip_num(counter_path: Path, start: int) -> int:
 
 
 def _save_clip_counter(counter_path: Path, value: int) -> None:
-    with open(counter_path, "w") as f:
-        f.write(str(value))
+    write_text_atomic(counter_path, str(value))
 
 
 def _load_uploaded_paths(tracking_path: Path) -> set[str]:
@@ -180,6 +295,7 @@ def upload_clips(
     Only successful uploads count toward clip numbering. Pass clip_nums to share numbering with TikTok.
     Skips clips that were already uploaded (tracked in youtube_uploaded.json).
     champion: from game_events.json local_player_champion; used in title_template as {champion}.
+    Up to youtube.max_concurrent_uploads (default 3) clips upload at once; results keep input order.
     """
     yt_cfg = config.get("youtube", {})
     if not yt_cfg.get("enabled", False):
@@ -190,16 +306,19 @@ def upload_clips(
     tracking_path = root / UPLOADED_TRACKING_FILE
     uploaded_set = _load_uploaded_paths(tracking_path)
 
-    # Filter out already-uploaded clips
+    # Filter out already-uploaded clips, and bad files before we spend time authenticating
+    next_num = _get_next_clip_num(counter_path, yt_cfg.get("clip_counter_start", 1))
     to_upload: list[tuple[str, int]] = []
     for i, path in enumerate(clip_paths):
+        problem = clip_problem(path)
+        if problem:
+            emit_log(log, f"  Skipping ({problem}): {Path(path).name}")
+            continue
         resolved = str(Path(path).resolve())
         if resolved in uploaded_set:
             emit_log(log, f"  Skipping (already uploaded to YouTube): {Path(path).name}")
             continue
-        clip_num = (clip_nums[i] if clip_nums and i < len(clip_nums) else None) or (
-            _get_next_clip_num(counter_path, yt_cfg.get("clip_counter_start", 1)) + len(to_upload)
-        )
+        clip_num = (clip_nums[i] if clip_nums and i < len(clip_nums) else None) or next_num + len(to_upload)
         to_upload.append((path, clip_num))
 
     if not to_upload:
@@ -213,33 +332,102 @@ def upload_clips(
     description = yt_cfg.get("description", "")
     tags = yt_cfg.get("tags", ["League of Legends", "Gaming", "Shorts"])
     privacy = yt_cfg.get("privacy", "private")
-
-    youtube = get_youtube_service(secrets_path=secrets_file, log=log)
-    uploaded = []
-    success_clip_nums = []
-    for i, (path, clip_num) in enumerate(to_upload):
-        n = i + 1
-        total = len(to_upload)
-        title = title_template.format(
-            num=clip_num, n=n, total=total,
+    chunksize_mb = yt_cfg.get("upload_chunksize_mb", 8)
+
+    creds = get_youtube_credentials(secrets_path=secrets_file, log=log)
+    total = len(to_upload)
+    # Titles and display names are fixed per run: build them once, outside the workers
+    titles = [
+        title_template.format(
+            num=clip_num, n=i + 1, total=total,
             champion=champion, ChampionName=champion,
             champion_suffix=champ_suffix,
             creator=creator, username=creator,
         )
-        emit_log(log, f"  Uploading clip {n}/{total} (#{clip_num}): {Path(path).name}")
+        for i, (_, clip_num) in enumerate(to_upload)
+    ]
+    names = [Path(path).name for path, _ in to_upload]
+    max_workers = max(1, min(int(yt_cfg.get("max_concurrent_uploads", 3)), total))
+    limiter = RateLimiter(yt_cfg.get("requests_per_minute", 60))
+    lock = threading.Lock()  # guards the tracking file and next_counter
+    thread_state = threading.local()
+    next_counter = None
+
+    def _finish(
+        i: int, path: str, clip_num: int, vid: str | None, err: BaseException | None, clip_start: float
+    ) -> tuple[int, str | None, BaseException | None]:
+        """Log the outcome of one upload; on success record it (tracking file + counter)."""
+        nonlocal next_counter
+        if err is not None:
+            emit_log(log, f"    -> #{clip_num} Error: {err}")
+            return i, None, err
+        if not vid:
+            emit_log(log, f"    -> #{clip_num} Failed")
+            return i, None, None
+        with lock:
+            _mark_uploaded(tracking_path, path)
+            if next_counter is None or clip_num + 1 > next_counter:
+                next_counter = clip_num + 1
+        dt = time.perf_counter() - clip_start
+        emit_log(log, f"    -> #{clip_num} https://youtube.com/shorts/{vid}  ({format_elapsed(dt)})")
+        return i, vid, None
+
+    def _upload_one(i: int, path: str, clip_num: int) -> tuple[int, str | None, BaseException | None]:
+        # googleapiclient services (httplib2 underneath) aren't thread-safe: one per worker thread
+        youtube = getattr(thread_state, "youtube", None)
+        if youtube is None:
+            youtube = thread_state.youtube = _build_service(creds)
+        emit_log(log, f"  Uploading clip {i + 1}/{total} (#{clip_num}): {names[i]}")
         clip_start = time.perf_counter()
         try:
-            vid = upload_video(path, title=title, description=description, tags=tags, privacy=privacy, youtube=youtube)
-            if vid:
-                uploaded.append(vid)
-                success_clip_nums.append(clip_num)
-                _mark_uploaded(tracking_path, path)
-                if clip_nums is None:
-                    _save_clip_counter(counter_path, clip_num + 1)
-                dt = time.perf_counter() - clip_start
-                emit_log(log, f"    -> https://youtube.com/shorts/{vid}  ({format_elapsed(dt)})")
-            else:
-                emit_log(log, "    -> Failed")
+            # Refresh a nearly-expired token here (single-flight) rather than in every worker's AuthorizedHttp
+            get_youtube_credentials(secrets_path=secrets_file, log=log)
+            limiter.acquire()
+            vid = upload_video(
+                path, title=titles[i], description=description, tags=tags, privacy=privacy, youtube=youtube,
+                chunksize_mb=chunksize_mb,
+            )
         except Exception as e:
-            emit_log(log, f"    -> Error: {e}")
+            return _finish(i, path, clip_num, None, e, clip_start)
+        return _finish(i, path, clip_num, vid, None, clip_start)
+
+    def _upload_batch_async(
+        batch: list[tuple[int, tuple[str, int]]],
+    ) -> list[tuple[int, str | None, BaseException | None]]:
+        from youtube_upload_async import upload_videos_async
+
+        for i, (path, clip_num) in batch:
+            emit_log(log, f"  Uploading clip {i + 1}/{total} (#{clip_num}): {names[i]}")
+        batch_t0 = time.perf_counter()
+        items = [(path, video_body(titles[i], description, tags, privacy)) for i, (path, _) in batch]
+        outcomes = asyncio.run(
+            upload_videos_async(creds, items, max_concurrent=max_workers, before_each=limiter.acquire)
+        )
+        return [
+            _finish(i, path, clip_num, None, out, batch_t0) if isinstance(out, BaseException)
+            else _finish(i, path, clip_num, out, None, batch_t0)
+            for (i, (path, clip_num)), out in zip(batch, outcomes)
+        ]
+
+    # Paced submission: one shared rate limit, and each batch finishes before the next starts
+    batch_size = max(1, int(yt_cfg.get("batch_size", 10)))
+    use_async = yt_cfg.get("async_uploads", False)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+            for batch_start in range(0, total, batch_size):
+                batch = list(enumerate(to_upload[batch_start:batch_start + batch_size], batch_start))
+                if use_async:
+                    results.extend(_upload_batch_async(batch))
+                    continue
+                futures = [ex.submit(_upload_one, i, path, clip_num) for i, (path, clip_num) in batch]
+                results.extend(fut.result() for fut in as_completed(futures))
+    finally:
+        # Persist the counter once, even if the run is interrupted part-way
+        if clip_nums is None and next_counter is not None:
+            _save_clip_counter(counter_path, next_counter)
+    results.sort(key=lambda r: r[0])
+
+    uploaded = [vid for _, vid, _ in results if vid]
+    success_clip_nums = [to_upload[i][1] for i, vid, _ in results if vid]
     return uploaded, success_clip_nums
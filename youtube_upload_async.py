@@ -0,0 +1,102 @@
+"""
+Asynchronous YouTube uploads for CreatorAssistant.
+Talks to the YouTube Data API v3 resumable-upload endpoint directly with aiohttp, so many
+clips can be in flight on one thread. Optional: requires aiohttp and aiofiles.
+"""
+
+import asyncio
+import os
+import ssl
+import threading
+from collections.abc import AsyncIterator, Callable
+
+try:
+    import aiofiles
+    import aiohttp
+except ImportError:  # optional dependency; checked in upload_videos_async
+    aiofiles = None
+    aiohttp = None
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+UPLOAD_URL = "https://www.googleapis.com/upload/youtube/v3/videos"
+READ_CHUNK = 1024 * 1024
+
+
+async def _file_chunks(path: str, chunk_size: int = READ_CHUNK) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
+
+_refresh_lock = threading.Lock()
+
+
+def _refresh_once(creds: Credentials) -> None:
+    # Single flight: concurrent uploads that all saw an expired token trigger one refresh
+    with _refresh_lock:
+        if not creds.valid:
+            creds.refresh(Request())
+
+
+async def _auth_header(creds: Credentials) -> dict:
+    if not creds.valid:
+        await asyncio.to_thread(_refresh_once, creds)
+    return {"Authorization": f"Bearer {creds.token}"}
+
+
+async def upload_video_async(session: "aiohttp.ClientSession", creds: Credentials, path: str, body: dict) -> str | None:
+    """
+    Upload one video with the two-step resumable protocol: POST the metadata to open a session,
+    then PUT the file bytes (streamed) to the returned Location. Returns the video ID.
+    Raises RuntimeError on an HTTP error status.
+    """
+    size = os.path.getsize(path)
+    headers = await _auth_header(creds)
+    async with session.post(
+        UPLOAD_URL,
+        params={"uploadType": "resumable", "part": "snippet,status"},
+        headers={
+            **headers,
+            "X-Upload-Content-Type": "video/mp4",
+            "X-Upload-Content-Length": str(size),
+        },
+        json=body,
+    ) as resp:
+        if resp.status != 200:
+            raise RuntimeError(f"YouTube upload session failed ({resp.status}): {(await resp.text())[:200]}")
+        location = resp.headers["Location"]
+
+    async with session.put(
+        location,
+        headers={**headers, "Content-Type": "video/mp4", "Content-Length": str(size)},
+        data=_file_chunks(path),
+    ) as resp:
+        if resp.status not in (200, 201):
+            raise RuntimeError(f"YouTube upload failed ({resp.status}): {(await resp.text())[:200]}")
+        return (await resp.json()).get("id")
+
+
+async def upload_videos_async(
+    creds: Credentials,
+    items: list[tuple[str, dict]],
+    max_concurrent: int = 8,
+    before_each: Callable[[], None] | None = None,
+) -> list[str | None | BaseException]:
+    """
+    Upload (path, body) pairs concurrently over one connection pool of max_concurrent connections.
+    before_each (e.g. a RateLimiter.acquire) runs in a worker thread before each upload starts.
+    Returns one entry per item, in order: the video ID, or the exception that upload raised.
+    """
+    if aiohttp is None or aiofiles is None:
+        raise ImportError("Install aiohttp and aiofiles for async uploads: pip install aiohttp aiofiles")
+
+    async def _one(path: str, body: dict) -> str | None:
+        if before_each is not None:
+            await asyncio.to_thread(before_each)
+        return await upload_video_async(session, creds, path, body)
+
+    connector = aiohttp.TCPConnector(limit=max(1, max_concurrent), ssl=ssl.create_default_context())
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*(_one(path, body) for path, body in items), return_exceptions=True)